@@ -1,9 +1,13 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 from datetime import datetime
+import os
 from models.ai_helper import AIHelper
 from models.tutor import MathTutor
 from models.ontology_helper import OntologyHelper
+from models.leaderboard import Leaderboard, DEFAULT_CLASS
+from models.http_cache import StaticAssets, CacheStats, conditional_response, folder_fingerprint
 
 # Create Flask app
 app = Flask(__name__)
@@ -15,11 +19,21 @@ db = SQLAlchemy(app)
 # Initialize systems
 math_tutor = MathTutor()
 ontology_helper = OntologyHelper()
+leaderboard = Leaderboard(k=10)
+
+# Serve fingerprinted, precompressed static files
+cache_stats = CacheStats()
+static_assets = StaticAssets(app.static_folder, stats=cache_stats)
+# Changes to templates after a deploy must invalidate cached pages too
+template_version = folder_fingerprint(os.path.join(app.root_path, app.template_folder))
+app.url_defaults(static_assets.add_fingerprint)
+app.view_functions['static'] = static_assets.send
 
 # User Model
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
+    class_name = db.Column(db.String(80), default=DEFAULT_CLASS)
     level = db.Column(db.Integer, default=1)
     score = db.Column(db.Integer, default=0)
     total_problems = db.Column(db.Integer, default=0)
@@ -37,6 +51,36 @@ class ProblemHistory(db.Model):
     time_taken = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+def ensure_user_columns():
+    """Add columns introduced after the database was first created"""
+    columns = [column['name'] for column in inspect(db.engine).get_columns('user')]
+    if 'class_name' not in columns:
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                f"ALTER TABLE user ADD COLUMN class_name VARCHAR(80) DEFAULT '{DEFAULT_CLASS}'"))
+
+def load_leaderboard():
+    """Rebuild the in-memory leaderboard from the user table"""
+    rows = db.session.query(
+        User.id, User.username, User.class_name, User.level,
+        User.score, User.total_problems, User.correct_answers
+    ).yield_per(10000)
+    leaderboard.rebuild(
+        (user_id, username, class_name, level or 1, score or 0, total or 0, correct or 0)
+        for user_id, username, class_name, level, score, total, correct in rows
+    )
+
+def user_version(user):
+    """Fields that change whenever a graded answer updates the user"""
+    return (user.id, user.level, user.score, user.total_problems, user.correct_answers)
+
+def record_on_leaderboard(user):
+    """Push a user's latest progress into the leaderboard"""
+    if not leaderboard.loaded:
+        load_leaderboard()
+    leaderboard.record(user.id, user.username, user.class_name, user.level,
+                       user.score, user.total_problems, user.correct_answers)
+
 @app.route('/')
 def home():
     if 'username' not in session:
@@ -47,17 +91,23 @@ def home():
 def login():
     if request.method == 'POST':
         username = request.form['username']
+        class_name = request.form.get('class_name', '').strip()
         user = User.query.filter_by(username=username).first()
         
         if not user:
-            user = User(username=username)
+            user = User(username=username, class_name=class_name or DEFAULT_CLASS)
             db.session.add(user)
             db.session.commit()
+        elif class_name:
+            # Returning students can join or switch class from the login form
+            user.class_name = class_name
         
         session['username'] = username
         session['user_id'] = user.id
+        cache_stats.start_session()
         user.last_active = datetime.utcnow()
         db.session.commit()
+        record_on_leaderboard(user)
         
         return redirect(url_for('dashboard'))
     
@@ -72,18 +122,24 @@ def dashboard():
     if not user:
         return redirect(url_for('logout'))
 
-    # Get recent problem history
-    recent_problems = ProblemHistory.query.filter_by(user_id=user.id)\
-        .order_by(ProblemHistory.created_at.desc())\
-        .limit(5).all()
-    
     # Get performance analysis
     performance = math_tutor.get_performance_analysis()
-    
-    return render_template('dashboard.html', 
-                         user=user,
-                         recent_problems=recent_problems,
-                         performance=performance)
+
+    def render():
+        # Get recent problem history
+        recent_problems = ProblemHistory.query.filter_by(user_id=user.id)\
+            .order_by(ProblemHistory.created_at.desc())\
+            .limit(5).all()
+
+        return render_template('dashboard.html', 
+                             user=user,
+                             recent_problems=recent_problems,
+                             performance=performance)
+
+    # Skip the query and render entirely when nothing changed
+    etag_parts = ('dashboard', static_assets.build_id, template_version,
+                  user_version(user), performance)
+    return conditional_response('dashboard', etag_parts, render, stats=cache_stats)
 
 @app.route('/practice')
 def practice():
@@ -171,10 +227,11 @@ def check_answer():
             user.correct_answers += 1
             current_score = user.score + 10
 
-            # Handle level up condition
-            if current_score >= 50 and user.level < 3:
-                level_up_message = f'Congratulations! You\'ve completed Level {user.level}! Moving to Level {user.level + 1}'
-                new_level = user.level + 1
+            # Handle level up condition using the ontology's level chain
+            next_level = ontology_helper.get_next_level(user.level)
+            if current_score >= 50 and next_level:
+                level_up_message = f'Congratulations! You\'ve completed Level {user.level}! Moving to Level {next_level}'
+                new_level = next_level
                 user.level = new_level
                 user.score = 0
                 
@@ -192,6 +249,7 @@ def check_answer():
                 user.score = current_score
 
         db.session.commit()
+        record_on_leaderboard(user)
 
         # Get AI model info from ontology for feedback
         ai_models = ontology_helper.get_ai_model_details()
@@ -237,20 +295,76 @@ def get_stats():
         return jsonify({'status': 'error', 'message': 'User not found'})
 
     performance = math_tutor.get_performance_analysis()
-    
+
+    def render():
+        return jsonify({
+            'status': 'success',
+            'stats': {
+                'level': user.level,
+                'score': user.score,
+                'total_problems': user.total_problems,
+                'accuracy': performance['accuracy'],
+                'suggestion': performance['suggestion']
+            }
+        })
+
+    etag_parts = ('get_stats', user_version(user), performance)
+    return conditional_response('get_stats', etag_parts, render, stats=cache_stats)
+
+@app.route('/cache_stats')
+def get_cache_stats():
+    if 'username' not in session:
+        return jsonify({'status': 'error', 'message': 'Not logged in'})
+
     return jsonify({
         'status': 'success',
-        'stats': {
-            'level': user.level,
-            'score': user.score,
-            'total_problems': user.total_problems,
-            'accuracy': performance['accuracy'],
-            'suggestion': performance['suggestion']
-        }
+        'cache': cache_stats.get()
+    })
+
+@app.route('/leaderboard')
+def get_leaderboard():
+    if 'username' not in session:
+        return jsonify({'status': 'error', 'message': 'Not logged in'})
+
+    if not leaderboard.loaded:
+        load_leaderboard()
+
+    class_name = request.args.get('class_name')
+    return jsonify({
+        'status': 'success',
+        'class_name': class_name,
+        'leaderboard': leaderboard.get_top(class_name)
+    })
+
+@app.route('/leaderboard/classes')
+def get_leaderboard_classes():
+    if 'username' not in session:
+        return jsonify({'status': 'error', 'message': 'Not logged in'})
+
+    if not leaderboard.loaded:
+        load_leaderboard()
+
+    return jsonify({
+        'status': 'success',
+        'classes': leaderboard.get_classes()
+    })
+
+@app.route('/cohort_stats')
+def cohort_stats():
+    if 'username' not in session:
+        return jsonify({'status': 'error', 'message': 'Not logged in'})
+
+    if not leaderboard.loaded:
+        load_leaderboard()
+
+    return jsonify({
+        'status': 'success',
+        'levels': leaderboard.get_level_distribution()
     })
 
 @app.route('/logout')
 def logout():
+    cache_stats.end_session()
     session.clear()
     return redirect(url_for('login'))
 
@@ -268,4 +382,6 @@ if __name__ == '__main__':
         ontology_helper.ensure_ontology_directory()
         # Create database tables
         db.create_all()
+        ensure_user_columns()
+        load_leaderboard()
     app.run(debug=True)
\ No newline at end of file
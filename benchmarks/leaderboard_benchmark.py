@@ -0,0 +1,98 @@
+"""Benchmark the in-memory leaderboard with a large simulated cohort.
+
+Run from the project root:
+
+    python -m benchmarks.leaderboard_benchmark [users] [answers]
+"""
+import random
+import sys
+import time
+
+from models.leaderboard import Leaderboard
+
+CLASSES = [f"Class{i}" for i in range(1, 201)]
+CLASS_SWITCH_RATE = 0.001
+
+
+def simulated_users(count):
+    """Yield user rows shaped like the user table"""
+    for user_id in range(1, count + 1):
+        total = random.randint(0, 200)
+        correct = random.randint(0, total)
+        yield (user_id, f"student{user_id}", random.choice(CLASSES),
+               random.randint(1, 3), random.randrange(0, 50, 10), total, correct)
+
+
+def run(user_count=1_000_000, answer_count=1_000_000, k=10):
+    random.seed(42)
+    rows = list(simulated_users(user_count))
+    users = {row[0]: list(row) for row in rows}
+
+    leaderboard = Leaderboard(k=k)
+    start = time.perf_counter()
+    leaderboard.rebuild(rows)
+    rebuild_time = time.perf_counter() - start
+    print(f"Rebuild of {user_count:,} users: {rebuild_time:.2f}s")
+
+    # Simulate graded answers the same way check_answer updates a user
+    answers = [(random.randint(1, user_count), random.random() < 0.7)
+               for _ in range(answer_count)]
+    start = time.perf_counter()
+    for user_id, is_correct in answers:
+        user = users[user_id]
+        user[5] += 1
+        if is_correct:
+            user[6] += 1
+            if user[4] + 10 >= 50 and user[3] < 3:
+                user[3] += 1
+                user[4] = 0
+            else:
+                user[4] += 10
+        leaderboard.record(*user)
+    update_time = time.perf_counter() - start
+    print(f"{answer_count:,} graded answers: {update_time:.2f}s "
+          f"({answer_count / update_time:,.0f} answers/s, "
+          f"{update_time / answer_count * 1e6:.1f}us each)")
+
+    # Students occasionally switch class at login, which re-ranks the old class
+    switches = [(random.randint(1, user_count), random.choice(CLASSES))
+                for _ in range(int(answer_count * CLASS_SWITCH_RATE))]
+    # Always move the leader of the first class so its ranking must refill
+    leader = leaderboard.get_top(CLASSES[0])[0]['username']
+    switches.append((int(leader[len("student"):]), CLASSES[1]))
+    start = time.perf_counter()
+    for user_id, class_name in switches:
+        user = users[user_id]
+        user[2] = class_name
+        leaderboard.record(*user)
+    switch_time = time.perf_counter() - start
+    print(f"{len(switches):,} class switches: {switch_time:.2f}s "
+          f"({switch_time / len(switches) * 1e3:.2f}ms each)")
+
+    queries = 10_000
+    start = time.perf_counter()
+    for i in range(queries):
+        leaderboard.get_top()
+        leaderboard.get_top(CLASSES[i % len(CLASSES)])
+        leaderboard.get_level_distribution()
+    query_time = time.perf_counter() - start
+    print(f"{queries:,} x (global top-{k} + class top-{k} + level distribution): "
+          f"{query_time / queries * 1e6:.1f}us per round")
+
+    # Check the incremental rankings against a full sort
+    expected = sorted(users.values(), key=lambda u: (-u[3], -u[4], -u[6], u[0]))[:k]
+    actual = [entry['username'] for entry in leaderboard.get_top()]
+    assert actual == [u[1] for u in expected], "Global ranking does not match a full sort"
+    class_users = {}
+    for u in users.values():
+        class_users.setdefault(u[2], []).append(u)
+    for class_name, members in class_users.items():
+        expected = sorted(members, key=lambda u: (-u[3], -u[4], -u[6], u[0]))[:k]
+        actual = [entry['username'] for entry in leaderboard.get_top(class_name)]
+        assert actual == [u[1] for u in expected], f"{class_name} ranking does not match a full sort"
+    print(f"Global and all {len(class_users)} class top-K rankings match a full sort")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,278 @@
+from flask import Response, request, send_from_directory, session
+from collections import OrderedDict
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+import uuid
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+MIN_COMPRESS_SIZE = 256
+MAX_TRACKED_SESSIONS = 10000
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and (
+        mimetype.startswith("text/")
+        or mimetype in ("application/javascript", "application/json", "image/svg+xml")
+    )
+
+
+def folder_fingerprint(folder):
+    """Hash the names and contents of every file in a folder, e.g. templates"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, folder).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class StaticAssets:
+    """Content-hashed static files with gzip/brotli variants built once in memory"""
+
+    def __init__(self, static_folder, stats=None):
+        self.static_folder = static_folder
+        self.stats = stats
+        self.lock = threading.Lock()
+        self.assets = {}
+        self.build_id = ""
+        self.load()
+
+    def _build_asset(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        variants = {'identity': data}
+        if _is_compressible(mimetype) and len(data) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                variants['gzip'] = compressed
+            if brotli:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    variants['br'] = compressed
+
+        return {
+            'digest': hashlib.sha256(data).hexdigest()[:12],
+            'mimetype': mimetype,
+            'mtime': os.path.getmtime(path),
+            'variants': variants
+        }
+
+    def _update_build_id(self):
+        digests = "".join(f"{name}:{asset['digest']}" for name, asset in sorted(self.assets.items()))
+        self.build_id = hashlib.sha256(digests.encode()).hexdigest()[:12]
+
+    def load(self):
+        """Hash and precompress every file in the static folder"""
+        assets = {}
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                filename = os.path.relpath(os.path.join(root, name), self.static_folder)
+                filename = filename.replace(os.sep, "/")
+                try:
+                    assets[filename] = self._build_asset(filename)
+                except OSError as e:
+                    print(f"Error loading static asset {filename}: {e}")
+        with self.lock:
+            self.assets = assets
+            self._update_build_id()
+
+    def get(self, filename):
+        """Get an asset, rebuilding it if the file changed on disk"""
+        asset = self.assets.get(filename)
+        if not asset:
+            return None
+        try:
+            if os.path.getmtime(os.path.join(self.static_folder, filename)) != asset['mtime']:
+                asset = self._build_asset(filename)
+                with self.lock:
+                    self.assets[filename] = asset
+                    self._update_build_id()
+        except OSError:
+            return None
+        return asset
+
+    def add_fingerprint(self, endpoint, values):
+        """URL defaults hook adding ?v=<content hash> to static URLs"""
+        if endpoint != 'static' or 'v' in values:
+            return
+        asset = self.get(values.get('filename', ''))
+        if asset:
+            values['v'] = asset['digest']
+
+    def send(self, filename):
+        """Static view serving the best precompressed variant"""
+        asset = self.get(filename)
+        if not asset:
+            return send_from_directory(self.static_folder, filename)
+
+        # Highest client quality wins, preferring br over gzip on ties
+        variants = asset['variants']
+        encoding, best_quality = 'identity', 0
+        for candidate in ('br', 'gzip'):
+            quality = request.accept_encodings[candidate]
+            if candidate in variants and quality > best_quality:
+                encoding, best_quality = candidate, quality
+        if request.accept_encodings['identity'] > best_quality:
+            encoding = 'identity'
+
+        response = Response(variants[encoding], mimetype=asset['mimetype'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(f"{asset['digest']}-{encoding}")
+        if request.args.get('v') == asset['digest']:
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+        response = response.make_conditional(request)
+
+        if self.stats:
+            sent = len(variants[encoding]) if response.status_code == 200 else 0
+            self.stats.record_static(len(variants['identity']), sent)
+        return response
+
+
+class CacheStats:
+    """Per-session counters for bytes and render time saved by caching.
+
+    A session starts at login and ends at logout; requests made outside a
+    session (e.g. the login page) are not counted. Sessions that are never
+    logged out are dropped least recently used first past max_sessions.
+    """
+
+    def __init__(self, max_sessions=MAX_TRACKED_SESSIONS):
+        self.lock = threading.Lock()
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session id -> counters, oldest first
+        self.last_render = {}  # session id -> {view: (bytes, seconds)}
+
+    @staticmethod
+    def _new_counters():
+        return {
+            'requests': 0,
+            'not_modified': 0,
+            'bytes_full': 0,
+            'bytes_sent': 0,
+            'render_seconds': 0.0,
+            'render_seconds_saved': 0.0
+        }
+
+    @staticmethod
+    def _session_key():
+        return session.get('cache_session')
+
+    def start_session(self):
+        """Begin counting for a new login session"""
+        self.end_session()
+        key = uuid.uuid4().hex
+        session['cache_session'] = key
+        with self.lock:
+            self.sessions[key] = self._new_counters()
+            self.last_render[key] = {}
+            while len(self.sessions) > self.max_sessions:
+                evicted, _ = self.sessions.popitem(last=False)
+                self.last_render.pop(evicted, None)
+
+    def end_session(self):
+        """Drop the counters of the current session"""
+        key = session.pop('cache_session', None)
+        with self.lock:
+            self.sessions.pop(key, None)
+            self.last_render.pop(key, None)
+
+    def _active_counters(self, key):
+        """Get a session's counters and mark it as recently used"""
+        counters = self.sessions.get(key)
+        if counters is not None:
+            self.sessions.move_to_end(key)
+        return counters
+
+    def record_static(self, full_bytes, sent_bytes):
+        """Record a static file request and the bytes actually sent"""
+        with self.lock:
+            counters = self._active_counters(self._session_key())
+            if counters is None:
+                return
+            counters['requests'] += 1
+            counters['bytes_full'] += full_bytes
+            counters['bytes_sent'] += sent_bytes
+            if not sent_bytes:
+                counters['not_modified'] += 1
+
+    def record_render(self, view, size, seconds):
+        """Record a fully rendered dynamic response"""
+        key = self._session_key()
+        with self.lock:
+            counters = self._active_counters(key)
+            if counters is None:
+                return
+            counters['requests'] += 1
+            counters['bytes_full'] += size
+            counters['bytes_sent'] += size
+            counters['render_seconds'] += seconds
+            self.last_render[key][view] = (size, seconds)
+
+    def record_not_modified(self, view):
+        """Record a 304 and credit the size and time of the last render"""
+        key = self._session_key()
+        with self.lock:
+            counters = self._active_counters(key)
+            if counters is None:
+                return
+            size, seconds = self.last_render[key].get(view, (0, 0.0))
+            counters['requests'] += 1
+            counters['not_modified'] += 1
+            counters['bytes_full'] += size
+            counters['render_seconds_saved'] += seconds
+
+    def get(self):
+        """Get the counters for the current session"""
+        with self.lock:
+            counters = dict(self.sessions.get(self._session_key()) or self._new_counters())
+        counters['bytes_saved'] = counters['bytes_full'] - counters['bytes_sent']
+        counters['render_seconds'] = round(counters['render_seconds'], 4)
+        counters['render_seconds_saved'] = round(counters['render_seconds_saved'], 4)
+        return counters
+
+
+def conditional_response(view, etag_parts, render, stats=None):
+    """Return 304 when the client's ETag matches, otherwise render the view.
+
+    etag_parts should cover everything the rendered output depends on, so
+    rendering is skipped entirely for unchanged views.
+    """
+    etag = hashlib.sha256(repr(etag_parts).encode()).hexdigest()[:16]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        if stats:
+            stats.record_not_modified(view)
+    else:
+        start = time.perf_counter()
+        response = render()
+        if not isinstance(response, Response):
+            response = Response(response)
+        if stats:
+            stats.record_render(view, len(response.get_data()), time.perf_counter() - start)
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['Vary'] = 'Cookie'
+    return response
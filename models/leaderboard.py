@@ -0,0 +1,173 @@
+from bisect import insort
+import heapq
+import threading
+
+DEFAULT_CLASS = "General"
+ACCURACY_BUCKETS = 10
+
+
+class TopK:
+    """Bounded ranking of the K best entries, kept sorted best first.
+
+    Ranking keys only grow in this app (score goes up on correct answers
+    and level goes up when score resets), so a user that drops out of the
+    top K can only come back by beating the current K-th entry. Taking a
+    user out would free a slot for someone weaker, so a class ranking is
+    rebuilt from all its members when a student leaves the class instead.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.entries = []  # (negated key, user_id), ascending = best first
+        self.members = {}  # user_id -> negated key
+
+    def update(self, user_id, key):
+        """Insert or move a user, evicting the K-th entry if needed"""
+        neg_key = tuple(-part for part in key)
+        old_key = self.members.get(user_id)
+        if old_key is not None:
+            if old_key == neg_key:
+                return
+            self.entries.remove((old_key, user_id))
+        elif len(self.entries) >= self.k and (neg_key, user_id) > self.entries[-1]:
+            return
+
+        insort(self.entries, (neg_key, user_id))
+        self.members[user_id] = neg_key
+        if len(self.entries) > self.k:
+            _, evicted = self.entries.pop()
+            del self.members[evicted]
+
+    def top(self):
+        """Get user ids from best to worst"""
+        return [user_id for _, user_id in self.entries]
+
+
+class Leaderboard:
+    """Incrementally maintained global/per-class rankings and per-level accuracy"""
+
+    def __init__(self, k=10):
+        self.k = k
+        self.lock = threading.Lock()
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.users = {}  # user_id -> (username, class_name, level, score, total, correct)
+        self.global_top = TopK(self.k)
+        self.class_tops = {}
+        self.class_names = []  # kept sorted as classes are created
+        self.class_members = {}  # class name -> set of user ids
+        self.level_buckets = {}  # level -> [count per accuracy bucket]
+        self.level_totals = {}  # level -> [problems, correct answers]
+
+    @staticmethod
+    def rank_key(level, score, correct):
+        """Higher level first, then score, then total correct answers"""
+        return (level, score, correct)
+
+    @staticmethod
+    def _bucket(total, correct):
+        if not total:
+            return 0
+        return min(correct * ACCURACY_BUCKETS // total, ACCURACY_BUCKETS - 1)
+
+    def _remove_from_levels(self, level, total, correct):
+        self.level_buckets[level][self._bucket(total, correct)] -= 1
+        self.level_totals[level][0] -= total
+        self.level_totals[level][1] -= correct
+
+    def _add_to_levels(self, level, total, correct):
+        buckets = self.level_buckets.setdefault(level, [0] * ACCURACY_BUCKETS)
+        buckets[self._bucket(total, correct)] += 1
+        totals = self.level_totals.setdefault(level, [0, 0])
+        totals[0] += total
+        totals[1] += correct
+
+    def _refill_class(self, class_name):
+        """Rebuild a class ranking from its members after one of them left"""
+        def sort_key(user_id):
+            _, _, level, score, _, correct = self.users[user_id]
+            return (-level, -score, -correct, user_id)
+
+        ranking = TopK(self.k)
+        for user_id in heapq.nsmallest(self.k, self.class_members[class_name], key=sort_key):
+            _, _, level, score, _, correct = self.users[user_id]
+            ranking.update(user_id, self.rank_key(level, score, correct))
+        self.class_tops[class_name] = ranking
+
+    def _record(self, user_id, username, class_name, level, score, total, correct):
+        class_name = class_name or DEFAULT_CLASS
+        old = self.users.get(user_id)
+        if old:
+            self._remove_from_levels(old[2], old[4], old[5])
+            if old[1] != class_name:
+                # Switching class is rare, so re-rank the old class in full
+                self.class_members[old[1]].discard(user_id)
+                self._refill_class(old[1])
+
+        self.users[user_id] = (username, class_name, level, score, total, correct)
+        self._add_to_levels(level, total, correct)
+
+        key = self.rank_key(level, score, correct)
+        self.global_top.update(user_id, key)
+        if class_name not in self.class_tops:
+            self.class_tops[class_name] = TopK(self.k)
+            self.class_members[class_name] = set()
+            insort(self.class_names, class_name)
+        self.class_members[class_name].add(user_id)
+        self.class_tops[class_name].update(user_id, key)
+
+    def record(self, user_id, username, class_name, level, score, total, correct):
+        """Update rankings after a user's answer has been graded"""
+        with self.lock:
+            self._record(user_id, username, class_name, level, score, total, correct)
+
+    def rebuild(self, rows):
+        """Rebuild everything from (id, username, class_name, level, score,
+        total_problems, correct_answers) rows, e.g. the user table on startup"""
+        with self.lock:
+            self._reset()
+            for row in rows:
+                self._record(*row)
+            self.loaded = True
+
+    def get_top(self, class_name=None):
+        """Get the top K users globally or for one class"""
+        with self.lock:
+            if class_name:
+                ranking = self.class_tops.get(class_name)
+                user_ids = ranking.top() if ranking else []
+            else:
+                user_ids = self.global_top.top()
+
+            result = []
+            for rank, user_id in enumerate(user_ids, start=1):
+                username, user_class, level, score, total, correct = self.users[user_id]
+                result.append({
+                    'rank': rank,
+                    'username': username,
+                    'class_name': user_class,
+                    'level': level,
+                    'score': score,
+                    'correct_answers': correct
+                })
+            return result
+
+    def get_level_distribution(self):
+        """Get the accuracy histogram and mean accuracy for each level"""
+        with self.lock:
+            distribution = {}
+            for level, buckets in sorted(self.level_buckets.items()):
+                total, correct = self.level_totals[level]
+                distribution[level] = {
+                    'students': sum(buckets),
+                    'accuracy': round(correct / total * 100, 2) if total else 0,
+                    'buckets': list(buckets)
+                }
+            return distribution
+
+    def get_classes(self):
+        """Get the names of all classes students have joined"""
+        with self.lock:
+            return list(self.class_names)
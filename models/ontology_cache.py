@@ -0,0 +1,156 @@
+from owlready2 import *
+import argparse
+import hashlib
+import json
+import os
+import re
+
+# Bump when the layout of the cache file changes
+CACHE_FORMAT_VERSION = 3
+
+ONTOLOGY_DIR = "./ontology"
+ONTOLOGY_FILE = "math_tutor.owl"
+CACHE_FILE = "math_tutor_inferred.json"
+
+
+def ontology_fingerprint(ontology_file=os.path.join(ONTOLOGY_DIR, ONTOLOGY_FILE)):
+    """Get a hash of the ontology source used to detect a stale cache"""
+    with open(ontology_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_inferred_cache(cache_file=os.path.join(ONTOLOGY_DIR, CACHE_FILE),
+                        ontology_file=os.path.join(ONTOLOGY_DIR, ONTOLOGY_FILE)):
+    """Load the precomputed inferences, or None if missing or stale"""
+    try:
+        if not os.path.exists(cache_file):
+            print(f"No inferred ontology cache at {cache_file}, using live lookups")
+            return None
+
+        with open(cache_file) as f:
+            cache = json.load(f)
+
+        if cache.get('version') != CACHE_FORMAT_VERSION:
+            print("Inferred ontology cache has an old format, rebuild it with "
+                  "'python -m models.ontology_cache'")
+            return None
+        if cache.get('source_sha256') != ontology_fingerprint(ontology_file):
+            print("Inferred ontology cache is stale, rebuild it with "
+                  "'python -m models.ontology_cache'")
+            return None
+        if not cache.get('reasoned'):
+            print("Ontology cache holds asserted facts only, the reasoner did not run "
+                  "when it was built")
+
+        return cache
+    except Exception as e:
+        print(f"Error loading inferred ontology cache: {e}")
+        return None
+
+
+def _level_number(level_name):
+    """Get the numeric part of a difficulty level name, e.g. Level2 -> 2"""
+    match = re.search(r"(\d+)$", level_name)
+    return int(match.group(1)) if match else None
+
+
+def _data_property(onto, name):
+    """Look up a data property by its IRI fragment, e.g. equation_(string)"""
+    prop = onto.search_one(iri=f"*#{name}")
+    if prop is None:
+        raise ValueError(f"Ontology has no data property '{name}'")
+    return prop
+
+
+def _first_value(onto, individual, name):
+    """Get the first value of a data property, failing if it is not set"""
+    values = _data_property(onto, name)[individual]
+    if not values:
+        raise ValueError(f"{individual.name} has no value for '{name}'")
+    return values[0]
+
+
+def build_inferred_cache(ontology_dir=ONTOLOGY_DIR, cache_file=None, asserted_only=False):
+    """Run the reasoner once and write the inferred facts to a JSON file.
+
+    A reasoner failure stops the build unless asserted_only is set, in which
+    case the asserted facts are written and the cache is marked unreasoned.
+    """
+    cache_file = cache_file or os.path.join(ontology_dir, CACHE_FILE)
+
+    onto_path.append(ontology_dir)
+    onto = get_ontology(ONTOLOGY_FILE).load()
+
+    reasoned = False
+    try:
+        with onto:
+            sync_reasoner(infer_property_values=True)
+        reasoned = True
+        print("Reasoner finished")
+    except Exception as e:
+        if not asserted_only:
+            raise RuntimeError(
+                f"Reasoner failed ({e}); rerun with --asserted-only to build "
+                "the cache from asserted facts") from e
+        print(f"Error running reasoner, using asserted facts only: {e}")
+
+    # Problem -> difficulty, equation and solution
+    problems = {}
+    for problem in onto.Problem.instances():
+        if not problem.hasDifficulty:
+            raise ValueError(f"{problem.name} has no value for 'hasDifficulty'")
+        problems[problem.name] = {
+            'difficulty': str(problem.hasDifficulty[0].name),
+            'equation': str(_first_value(onto, problem, "equation_(string)")),
+            'solution': float(_first_value(onto, problem, "solution_(float)"))
+        }
+
+    # The ontology has no prerequisite relation between difficulty levels,
+    # so they are ordered by the number in their names (Level1 -> Level2 ...)
+    level_numbers = sorted(
+        number
+        for ind in onto.DifficultyLevel.instances()
+        for number in [_level_number(ind.name)]
+        if number is not None
+    )
+    next_level = {
+        str(number): level_numbers[index + 1] if index + 1 < len(level_numbers) else None
+        for index, number in enumerate(level_numbers)
+    }
+
+    bert_model = onto.search_one(type=onto.BERTModel)
+    t5_model = onto.search_one(type=onto.T5Model)
+    if not bert_model or not t5_model:
+        raise ValueError("Ontology has no BERTModel or T5Model individual")
+    ai_models = {
+        'bert': {
+            'version': str(_first_value(onto, bert_model, "modelVersion_(string)")),
+            'accuracy': float(_first_value(onto, bert_model, "modelAccuracy_(float)"))
+        },
+        't5': {
+            'version': str(_first_value(onto, t5_model, "modelVersion_(string)"))
+        }
+    }
+
+    cache = {
+        'version': CACHE_FORMAT_VERSION,
+        'source_sha256': ontology_fingerprint(os.path.join(ontology_dir, ONTOLOGY_FILE)),
+        'reasoned': reasoned,
+        'problems': problems,
+        'next_level': next_level,
+        'ai_models': ai_models
+    }
+
+    with open(cache_file, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    kind = "Inferred" if reasoned else "Asserted-only"
+    print(f"{kind} ontology cache written to {cache_file}")
+    return cache
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute ontology facts for OntologyHelper")
+    parser.add_argument("--asserted-only", action="store_true",
+                        help="write asserted facts if the reasoner cannot run")
+    args = parser.parse_args()
+    build_inferred_cache(asserted_only=args.asserted_only)
@@ -1,5 +1,6 @@
 from owlready2 import *
 import os
+from .ontology_cache import load_inferred_cache
 
 class OntologyHelper:
     def __init__(self):
@@ -12,8 +13,15 @@ class OntologyHelper:
             print(f"Error loading ontology: {e}")
             self.onto = None
 
+        # Reasoner output precomputed by 'python -m models.ontology_cache'
+        self.inferred = load_inferred_cache()
+
     def get_problem_difficulty(self, problem_id):
         """Get difficulty level for a problem from ontology"""
+        if self.inferred:
+            details = self.inferred['problems'].get(problem_id)
+            return details.get('difficulty', "Level1") if details else "Level1"
+
         try:
             if not self.onto:
                 return "Level1"
@@ -28,6 +36,10 @@ class OntologyHelper:
 
     def get_problem_details(self, problem_id):
         """Get full problem details from ontology"""
+        if self.inferred:
+            details = self.inferred['problems'].get(problem_id)
+            return dict(details) if details else None
+
         try:
             if not self.onto:
                 return None
@@ -45,6 +57,9 @@ class OntologyHelper:
 
     def get_ai_model_details(self):
         """Get AI model information from ontology"""
+        if self.inferred and self.inferred['ai_models']:
+            return self.inferred['ai_models']
+
         try:
             if not self.onto:
                 return {
@@ -82,6 +97,12 @@ class OntologyHelper:
                 }
             }
 
+    def get_next_level(self, level):
+        """Get the level that follows the given one, or None at the top level"""
+        if self.inferred:
+            return self.inferred['next_level'].get(str(level))
+        return level + 1 if level < 3 else None
+
     def update_user_level(self, username, new_level):
         """Update user level in ontology"""
         try: